@@ -0,0 +1,12 @@
+"""Precompute the dictionary index loaded by SlovakWordGenerator.
+
+Run after changing sk_SK.dic:
+
+    python build_index.py
+"""
+import numpy as np
+
+from slovak_letters import parse_dictionary
+
+if __name__ == "__main__":
+    np.savez_compressed('sk_SK.npz', **parse_dictionary('sk_SK.dic'))
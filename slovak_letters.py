@@ -1,10 +1,123 @@
+import re
 import streamlit as st
 from collections import Counter
+from pathlib import Path
+import numpy as np
 import pandas as pd
 
+try:
+    from numba import njit
+except ImportError:  # numba is optional; the packed numpy scan is used instead
+    njit = None
+
+# The word part of a .dic line: everything before the affix flags ("/...")
+# or the morphological fields, skipping comment lines
+DIC_WORD = re.compile(r'^(?!#)([^/\s]+)', re.MULTILINE)
+
+# Every letter a normalized word can contain; disallowed diacritics are
+# folded away, so their columns simply stay empty
+DIACRITIC_LETTERS = 'áäčďéíĺľňóôŕšťúýž'
+DIACRITICS = frozenset(DIACRITIC_LETTERS)
+ALPHABET = 'abcdefghijklmnopqrstuvwxyz' + DIACRITIC_LETTERS
+LETTER_INDEX = {c: i for i, c in enumerate(ALPHABET)}
+
+# Codepoint -> ALPHABET column; any other character lands in a spare last bin
+CODEPOINT_INDEX = np.full(max(map(ord, ALPHABET)) + 2, len(ALPHABET), dtype=np.intp)
+CODEPOINT_INDEX[[ord(c) for c in ALPHABET]] = np.arange(len(ALPHABET))
+
+def letter_columns(text):
+    """Map each character of text to its ALPHABET column, all in numpy."""
+    codepoints = np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32)
+    return CODEPOINT_INDEX[np.minimum(codepoints, len(CODEPOINT_INDEX) - 1)]
+
+def letter_histogram(text):
+    """Count the ALPHABET letters in text, ignoring everything else."""
+    counts = np.bincount(letter_columns(text), minlength=len(ALPHABET) + 1)
+    return counts[:len(ALPHABET)].astype(np.int8)
+
+# Packed (SWAR) layout: 16 four-bit lanes per uint64, one lane per letter.
+# The top bit of every lane is a guard, so lane counts are clamped to 7
+LANES = 16
+PACKED_WORDS = -(-len(ALPHABET) // LANES)
+GUARD_BITS = np.uint64(0x8888888888888888)
+LANE_SHIFTS = np.arange(LANES, dtype=np.uint64) * np.uint64(4)
+
+def pack_counts(counts):
+    """Pack (N, len(ALPHABET)) letter counts into (N, PACKED_WORDS) uint64s."""
+    lanes = np.zeros((counts.shape[0], PACKED_WORDS * LANES), dtype=np.uint64)
+    lanes[:, :counts.shape[1]] = np.minimum(counts, 7)
+    lanes = lanes.reshape(-1, PACKED_WORDS, LANES) << LANE_SHIFTS
+    return np.bitwise_or.reduce(lanes, axis=2)
+
+if njit is not None:
+    @njit
+    def scan_counts(counts, rack):
+        """Mark the rows of counts that fit entirely within rack."""
+        fits = np.empty(counts.shape[0], dtype=np.bool_)
+        for i in range(counts.shape[0]):
+            ok = True
+            for k in range(counts.shape[1]):
+                if counts[i, k] > rack[k]:
+                    ok = False
+                    break
+            fits[i] = ok
+        return fits
+else:
+    scan_counts = None
+
+def parse_dictionary(filename):
+    """Parse a Hunspell .dic file into the column arrays the generator scans.
+
+    Words are kept as written (to preserve diacritics) next to a letter-count
+    histogram of their lowercase form, so a query is a single vectorized
+    comparison against the rack's histogram. Rows are sorted by length so
+    words longer than the rack can be sliced off.
+    """
+    # Pull every word out in one pass of the regex engine; dict.fromkeys
+    # drops repeated entries while keeping dictionary order
+    data = Path(filename).read_text(encoding='utf-8')
+    words = [word for word in dict.fromkeys(DIC_WORD.findall(data))
+             if all(c in LETTER_INDEX for c in word.lower())]
+
+    lengths = np.array([len(word) for word in words], dtype=np.int16)
+    counts = np.zeros((len(words), len(ALPHABET)), dtype=np.int8)
+    np.add.at(
+        counts,
+        (np.repeat(np.arange(len(words)), lengths),
+         letter_columns(''.join(words).lower())),
+        1,
+    )
+    diacritic_counts = np.array(
+        [sum(1 for c in word if c in DIACRITICS) for word in words],
+        dtype=np.int16,
+    )
+
+    order = np.argsort(lengths, kind='stable')
+    return {
+        'words': np.array(words)[order],
+        'counts': counts[order],
+        'lengths': lengths[order],
+        'diacritic_counts': diacritic_counts[order],
+    }
+
+@st.cache_resource
+def load_index(filename):
+    """Load the dictionary arrays once per process, shared by all generators."""
+    # Prefer the prebuilt index next to the .dic (see build_index.py), unless
+    # the .dic was edited after the index was built
+    index_path = Path(filename).with_suffix('.npz')
+    if (index_path.exists()
+            and index_path.stat().st_mtime >= Path(filename).stat().st_mtime):
+        with np.load(index_path) as npz:
+            index = dict(npz)
+    else:
+        index = parse_dictionary(filename)
+    # Convert once, so every generator points at the same Python strings
+    index['words'] = index['words'].astype(object)
+    return index
+
 class SlovakWordGenerator:
     def __init__(self, allowed_diacritics=None):
-        self.dictionary = set()
         self.allowed_diacritics = allowed_diacritics or set()
         self.slovak_map = {
             'á': 'a', 'ä': 'a', 'č': 'c', 'ď': 'd', 
@@ -13,52 +126,125 @@ class SlovakWordGenerator:
             'š': 's', 'ť': 't', 'ú': 'u', 'ý': 'y',
             'ž': 'z'
         }
+        # Folds every diacritic that isn't allowed onto its base letter
+        self.normalize_table = str.maketrans({
+            c: base for c, base in self.slovak_map.items()
+            if c not in self.allowed_diacritics
+        })
         self.load_dictionary('sk_SK.dic')
+        if scan_counts is not None:
+            # Compile now so the first query doesn't pay for it
+            scan_counts(self.counts[:1], np.zeros(len(ALPHABET), dtype=np.int8))
 
     def load_dictionary(self, filename):
-        with open(filename, 'r', encoding='utf-8') as file:
-            for line in file:
-                line = line.strip()
-                if line.startswith('#') or not line:
-                    continue
-                word = line.split('/')[0]
-                # Store original word to preserve diacritics
-                self.dictionary.add(word)
+        index = load_index(filename)
+
+        # Only words whose diacritics are all allowed can ever be generated,
+        # so drop the rest once here instead of checking them on every query.
+        # What remains has nothing left to fold: its histograms are already
+        # those of the normalized words
+        forbidden = [LETTER_INDEX[c] for c in self.slovak_map
+                     if c not in self.allowed_diacritics]
+        valid = ~index['counts'][:, forbidden].any(axis=1)
+
+        # The words stay shared; rows maps this selection's rows back to them
+        self.words = index['words']
+        self.rows = np.flatnonzero(valid).astype(np.int32)
+        self.counts = index['counts'][valid]
+        self.lengths = index['lengths'][valid]
+        self.diacritic_counts = index['diacritic_counts'][valid]
+        # The packed table only serves the scan used without numba
+        self.packed = pack_counts(self.counts) if scan_counts is None else None
 
     def normalize_slovak(self, text: str) -> str:
-        text = text.lower()
-        result = []
-        for c in text:
-            if c in self.allowed_diacritics:
-                result.append(c)
-            else:
-                result.append(self.slovak_map.get(c, c))
-        return ''.join(result)
+        return text.lower().translate(self.normalize_table)
 
     def can_make_word(self, available_letters: str, word: str) -> bool:
-        available = Counter(available_letters.lower())
-        needed = Counter(word.lower())
-        return all(available[c] >= needed[c] for c in needed)
+        # Match the rack the way find_words does: disallowed diacritics are
+        # folded in the rack but not in the word, so such words never fit
+        available = self.normalize_slovak(available_letters)
+        # A word longer than the rack can never fit; skip the counting
+        if len(word) > len(available):
+            return False
+        # Whatever survives the subtraction is missing from the rack
+        return not (Counter(word.lower()) - Counter(available))
+
+    def _scan_packed(self, rack, end):
+        # Parallel "rack >= word" on every lane: with the guard bit set in
+        # the rack, a lane keeps its guard bit after subtraction only if the
+        # rack has enough of that letter, and lanes never borrow from each other
+        rack_packed = pack_counts(rack[np.newaxis])[0] | GUARD_BITS
+        fits = ((rack_packed - self.packed[:end]) & GUARD_BITS) == GUARD_BITS
+        candidates = np.nonzero(fits.all(axis=1))[0]
+        # Lanes are clamped at 7, so confirm against the exact counts
+        return candidates[(self.counts[candidates] <= rack).all(axis=1)]
+
+    def find_words(self, letters: str) -> np.ndarray:
+        """Return the row indices of all valid words makeable from letters."""
+        normalized = self.normalize_slovak(letters)
+        rack = letter_histogram(normalized)
 
-    def calculate_word_score(self, word: str) -> int:
-        base_score = len(word) * 10
-        bonus = sum(2 for c in word if c in self.allowed_diacritics)
-        return base_score + bonus
+        # Only words no longer than the rack whose letter counts fit in it
+        end = np.searchsorted(self.lengths, len(normalized), side='right')
+        if scan_counts is not None:
+            return np.nonzero(scan_counts(self.counts[:end], rack))[0]
+        return self._scan_packed(rack, end)
 
     def generate_words(self, letters: str) -> list:
-        results = []
-        for word in self.dictionary:
-            # Only include words that can be made with given letters
-            if self.can_make_word(letters, word):
-                # Check if word only uses allowed diacritics
-                has_valid_diacritics = all(
-                    c in self.allowed_diacritics or c not in self.slovak_map 
-                    for c in word
-                )
-                if has_valid_diacritics:
-                    score = self.calculate_word_score(word)
-                    results.append((word, score))
-        return sorted(results, key=lambda x: (-x[1], -len(x[0])))
+        """Return (word, score, length, diacritic_count) tuples, best score first."""
+        df = self.generate_frame(letters).sort_values(
+            ["Skóre", "Dĺžka"], ascending=False, kind='stable'
+        )
+        return list(zip(df["Slovo"].tolist(), df["Skóre"].tolist(),
+                        df["Dĺžka"].tolist(), df["Diakritika"].tolist()))
+
+    def generate_frame(self, letters: str) -> pd.DataFrame:
+        """Return the makeable words as a table, longest first."""
+        candidates = self.find_words(letters)
+        lengths = self.lengths[candidates]
+        # Valid words carry only allowed diacritics, each worth a bonus of 2
+        diacritic_counts = self.diacritic_counts[candidates]
+        df = pd.DataFrame({
+            "Dĺžka": lengths,
+            "Slovo": self.words[self.rows[candidates]],  # Original words with diacritics
+            "Skóre": 10 * lengths + 2 * diacritic_counts,
+            "Diakritika": diacritic_counts,
+        })
+        return df.sort_values(["Dĺžka", "Skóre"], ascending=False, ignore_index=True)
+
+# Rows shown in the results table until the user asks for all of them
+TABLE_ROWS = 200
+
+@st.cache_resource(max_entries=16)
+def get_generator(allowed_diacritics: frozenset) -> SlovakWordGenerator:
+    # Loaded once per diacritic selection and shared across reruns
+    return SlovakWordGenerator(set(allowed_diacritics))
+
+@st.cache_data(max_entries=128)
+def compute_words(letters: str, allowed_diacritics: frozenset) -> pd.DataFrame:
+    # Repeated lookups of the same normalized rack skip the dictionary scan
+    return get_generator(allowed_diacritics).generate_frame(letters)
+
+# Widget callbacks run before the next rerun, so none of them needs st.rerun()
+def clear_results():
+    # Results belong to the rack and diacritics they were generated for
+    st.session_state.generated = None
+
+def clear_letters():
+    st.session_state.letters = ""
+    st.session_state.text_input = ""
+    clear_results()
+
+def change_word_length():
+    st.session_state.word_length = st.session_state.word_length_choice
+    clear_letters()
+
+def clear_diacritics():
+    st.session_state.allowed_diacritics = set()
+    for char in DIACRITIC_LETTERS:
+        if f"check_{char}" in st.session_state:
+            st.session_state[f"check_{char}"] = False
+    clear_results()
 
 def main():
     st.set_page_config(page_title="Generátor slovenských slov", page_icon="🇸🇰", layout="wide")
@@ -77,17 +263,15 @@ def main():
 
     with settings_tab:
         st.header("Nastavenia")
-        selected_length = st.radio(
+        st.radio(
             "Dĺžka slov:",
             [5, 10, 15],
             index=1,
             horizontal=True,
-            help="Vyberte požadovanú dĺžku slov na generovanie"
+            help="Vyberte požadovanú dĺžku slov na generovanie",
+            key="word_length_choice",
+            on_change=change_word_length
         )
-        if selected_length != st.session_state.word_length:
-            st.session_state.word_length = selected_length
-            st.session_state.letters = ""
-            st.rerun()
 
     with slovak_records_tab:
         st.header("Najdlhšie slovenské slová")
@@ -117,7 +301,8 @@ def main():
             letters = st.text_input(
                 f"Zadajte písmená (presne {st.session_state.word_length}):",
                 value=st.session_state.letters,
-                key="text_input"
+                key="text_input",
+                on_change=clear_results
             )
 
             diacritic_groups = {
@@ -136,7 +321,8 @@ def main():
                         checkbox = cols[i].checkbox(
                             char,
                             value=char in st.session_state.allowed_diacritics,
-                            key=f"check_{char}"
+                            key=f"check_{char}",
+                            on_change=clear_results
                         )
                         if checkbox and char not in st.session_state.allowed_diacritics:
                             st.session_state.allowed_diacritics.add(char)
@@ -150,97 +336,87 @@ def main():
             else:
                 st.write("Žiadne")
 
-            if st.button("Vyčistiť diakritiku", key="clear_diacritics"):
-                st.session_state.allowed_diacritics = set()
-                st.rerun()
+            st.button("Vyčistiť diakritiku", key="clear_diacritics", on_click=clear_diacritics)
 
         with col3:
             generate_button = st.button("Generovať slová", type="primary")
-            if st.button("Vyčistiť text", key="clear"):
-                st.session_state.letters = ""
-                st.rerun()
+            st.button("Vyčistiť text", key="clear", on_click=clear_letters)
 
         if letters != st.session_state.letters:
             st.session_state.letters = letters
 
         if generate_button and st.session_state.letters:
-            generator = SlovakWordGenerator(st.session_state.allowed_diacritics)
+            allowed_diacritics = frozenset(st.session_state.allowed_diacritics)
+            generator = get_generator(allowed_diacritics)
             
-            normalized_len = len(generator.normalize_slovak(st.session_state.letters))
+            normalized = generator.normalize_slovak(st.session_state.letters)
+            normalized_len = len(normalized)
             if normalized_len != st.session_state.word_length:
                 st.error(f"Prosím, zadajte presne {st.session_state.word_length} písmen! (Zadali ste {normalized_len})")
+                st.session_state.generated = None
             else:
-                words = generator.generate_words(st.session_state.letters)
+                # Keep the request so later reruns (e.g. the table toggle)
+                # still show the results
+                st.session_state.generated = (normalized, allowed_diacritics)
+
+        if st.session_state.get('generated'):
+            df = compute_words(*st.session_state.generated)
+            
+            if df.empty:
+                st.warning("Neboli nájdené žiadne slová.")
+            else:
+                total_words = len(df)
+                st.success(f"Nájdených {total_words} slov")
+
+                # Rank straight from the columns; lexsort's last key is primary
+                found = df["Slovo"].to_numpy()
+                scores = df["Skóre"].to_numpy()
+                lengths = df["Dĺžka"].to_numpy()
+                diacritic_counts = df["Diakritika"].to_numpy()
+
+                col1, col2 = st.columns(2)
                 
-                if not words:
-                    st.warning("Neboli nájdené žiadne slová.")
-                else:
-                    total_words = len(words)
-                    st.success(f"Nájdených {total_words} slov")
+                with col1:
+                    with st.expander("Top 10 podľa skóre", expanded=True):
+                        top_score = np.lexsort((-lengths, -scores))[:10]
+                        for i, k in enumerate(top_score, 1):
+                            st.write(f"{i}. **{found[k]}** (skóre: {scores[k]}, dĺžka: {lengths[k]})")
+                    
+                    with st.expander("Top 10 najdlhších slov", expanded=True):
+                        top_longest = np.lexsort((-scores, -lengths))[:10]
+                        for i, k in enumerate(top_longest, 1):
+                            st.write(f"{i}. **{found[k]}** (dĺžka: {lengths[k]}, skóre: {scores[k]})")
 
-                    col1, col2 = st.columns(2)
+                with col2:
+                    with st.expander("Top 10 s najviac diakritickými znamienkami", expanded=True):
+                        top_diacritics = np.lexsort((-scores, -lengths, -diacritic_counts))[:10]
+                        for i, k in enumerate(top_diacritics, 1):
+                            st.write(f"{i}. **{found[k]}** (diakritika: {diacritic_counts[k]}, skóre: {scores[k]})")
                     
-                    with col1:
-                        with st.expander("Top 10 podľa skóre", expanded=True):
-                            top_score = sorted(words, key=lambda x: (-x[1], -len(x[0])))[:10]
-                            for i, (word, score) in enumerate(top_score, 1):
-                                st.write(f"{i}. **{word}** (skóre: {score}, dĺžka: {len(word)})")
-                        
-                        with st.expander("Top 10 najdlhších slov", expanded=True):
-                            top_longest = sorted(words, key=lambda x: (len(x[0]), x[1]), reverse=True)[:10]
-                            for i, (word, score) in enumerate(top_longest, 1):
-                                st.write(f"{i}. **{word}** (dĺžka: {len(word)}, skóre: {score})")
-
-                    with col2:
-                        with st.expander("Top 10 s najviac diakritickými znamienkami", expanded=True):
-                            def count_diacritics(word):
-                                return sum(1 for c in word if c in 'áäčďéíĺľňóôŕšťúýž')
-                            
-                            top_diacritics = sorted(words, 
-                                                key=lambda x: (count_diacritics(x[0]), len(x[0]), x[1]), 
-                                                reverse=True)[:10]
-                            for i, (word, score) in enumerate(top_diacritics, 1):
-                                diacritic_count = count_diacritics(word)
-                                st.write(f"{i}. **{word}** (diakritika: {diacritic_count}, skóre: {score})")
-                        
-                        with st.expander("Slová podľa dĺžky", expanded=True):
-                            length_groups = {}
-                            for word, score in words:
-                                length = len(word)
-                                if length not in length_groups:
-                                    length_groups[length] = []
-                                length_groups[length].append((word, score))
-                            
-                            for length in sorted(length_groups.keys(), reverse=True):
-                                group = length_groups[length]
-                                group.sort(key=lambda x: x[1], reverse=True)
-                                st.write(f"**{length} písmen** ({len(group)} slov):")
-                                for word, score in group[:5]:
-                                    st.write(f"- {word} (skóre: {score})")
-                                if len(group) > 5:
-                                    st.write(f"- *...a ďalších {len(group) - 5} slov*")
-
-                    # Create DataFrame for display
-                    data = []
-                    for word, score in sorted(words, key=lambda x: (-len(x[0]), -x[1])):
-                        data.append({
-                            "Dĺžka": len(word),
-                            "Slovo": word,  # Using original word with diacritics
-                            "Skóre": score,
-                            "Diakritika": sum(1 for c in word if c in 'áäčďéíĺľňóôŕšťúýž')
-                        })
-
-                    df = pd.DataFrame(data)
-                    st.dataframe(
-                        df,
-                        column_config={
-                            "Dĺžka": st.column_config.NumberColumn(help="Počet písmen v slove"),
-                            "Slovo": st.column_config.TextColumn(help="Nájdené slovo", width="large"),
-                            "Skóre": st.column_config.NumberColumn(help="Skóre slova"),
-                            "Diakritika": st.column_config.NumberColumn(help="Počet diakritických znamienok")
-                        },
-                        hide_index=True
-                    )
+                    with st.expander("Slová podľa dĺžky", expanded=True):
+                        # df is already sorted by length and score, both descending
+                        for length, group in df.groupby("Dĺžka", sort=False):
+                            st.write(f"**{length} písmen** ({len(group)} slov):")
+                            for word, score in group[["Slovo", "Skóre"]].head(5).itertuples(index=False):
+                                st.write(f"- {word} (skóre: {score})")
+                            if len(group) > 5:
+                                st.write(f"- *...a ďalších {len(group) - 5} slov*")
+
+                # Sending every row to the browser dominates for big racks, so
+                # the full table is opt-in
+                show_all = total_words > TABLE_ROWS and st.toggle(
+                    f"Zobraziť všetkých {total_words} slov", key="show_all_words"
+                )
+                st.dataframe(
+                    df if show_all else df.head(TABLE_ROWS),
+                    column_config={
+                        "Dĺžka": st.column_config.NumberColumn(help="Počet písmen v slove"),
+                        "Slovo": st.column_config.TextColumn(help="Nájdené slovo", width="large"),
+                        "Skóre": st.column_config.NumberColumn(help="Skóre slova"),
+                        "Diakritika": st.column_config.NumberColumn(help="Počet diakritických znamienok")
+                    },
+                    hide_index=True
+                )
 
 if __name__ == "__main__":
     main()
\ No newline at end of file